@@ -0,0 +1,67 @@
+import logging
+
+import pendulum
+from pipelines.archive import SnapshotArchiver
+from pipelines.compaction import SnapshotCompactor
+from pipelines.database.connection import get_session
+
+from airflow.exceptions import AirflowException
+from airflow.sdk import Param, dag, task
+
+# Use the Airflow task logger
+logger = logging.getLogger("dag_bmrs_datasets_maintenance")
+
+
+@dag(
+    dag_id="bmrs_datasets_maintenance",
+    schedule="15 2 * * *",  # Run daily at 02:15
+    start_date=pendulum.datetime(2025, 5, 10, tz="UTC"),
+    catchup=False,
+    max_active_runs=1,
+    tags=["daily", "maintenance"],
+    params={
+        "compact_after_hours": Param(
+            default=48,
+            type="integer",
+            minimum=1,
+            description="Compact superseded snapshots of windows that ended more than this many hours ago",
+        ),
+        "archive_after_days": Param(
+            default=30,
+            type="integer",
+            minimum=1,
+            description="Archive superseded raw snapshots older than this many days",
+        ),
+    },
+    description="A maintenance DAG for keeping the raw bmrs_datasets table small",
+)
+def bmrs_datasets_maintenance() -> None:
+    """Maintenance DAG for the raw bmrs datasets."""
+
+    @task(task_display_name="Compact superseded snapshots")
+    def compact(params: dict[str, int]) -> int:
+        """Delete snapshots that repeat the next newer snapshot of the same window."""
+        try:
+            with get_session() as db:
+                deleted: int = SnapshotCompactor(db).compact(pendulum.duration(hours=params["compact_after_hours"]))
+            logger.info("Compacted %s snapshots", deleted)
+            return deleted
+        except Exception as e:
+            raise AirflowException(f"Compaction failed: {e}") from e
+
+    @task(task_display_name="Archive old snapshots")
+    def archive(params: dict[str, int]) -> int:
+        """Move old superseded raw snapshots to compressed Parquet files and delete them from the table."""
+        try:
+            with get_session() as db:
+                archived: int = SnapshotArchiver(db).archive(pendulum.duration(days=params["archive_after_days"]))
+            logger.info("Archived %s snapshots", archived)
+            return archived
+        except Exception as e:
+            raise AirflowException(f"Archival failed: {e}") from e
+
+    compact() >> archive()  # type: ignore
+
+
+# Instantiate the DAG
+bmrs_datasets_maintenance()
@@ -5,6 +5,7 @@ import pendulum
 from pipelines.database.connection import get_session
 from pipelines.database.models import BmrsDataset
 from pipelines.helper import Helper
+from pipelines.revision_tracker import RevisionTracker
 from pipelines.validator import ParameterValidator as Validator
 from pipelines.wind_solar_api import WindSolarAPI
 from sqlalchemy import insert
@@ -72,6 +73,12 @@ def wind_and_solar_power_generation() -> None:
         else:
             # Default case: scheduled, etc.
             date_from = date_to = Helper.date_param(logical_date)
+            try:
+                # Extend the call back to older slots that are likely to have been revised
+                with get_session() as db:
+                    date_from = RevisionTracker(db).plan(date_to)
+            except Exception as e:
+                logger.warning("Revision lookback skipped: %s", e)
 
         return {
             "date_from": date_from,
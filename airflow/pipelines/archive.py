@@ -0,0 +1,215 @@
+import http
+import os
+import uuid
+from collections.abc import Iterator
+from datetime import datetime
+from typing import Any
+
+import pendulum
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pipelines.database.models import BmrsDataset
+from sqlalchemy import delete, exists, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.sql.elements import ColumnElement
+
+# Partition keys (data_type, day) live in the hive directory names, not in the files.
+SCHEMA = pa.schema(
+    [
+        ("id", pa.string()),
+        ("ingestion_ts", pa.timestamp("us", tz="UTC")),
+        ("window_from_utc", pa.timestamp("us", tz="UTC")),
+        ("window_to_utc", pa.timestamp("us", tz="UTC")),
+        ("request_url", pa.string()),
+        ("http_status", pa.int32()),
+        ("payload_json", pa.string()),
+    ],
+)
+PARTITION_SCHEMA = pa.schema([("data_type", pa.string()), ("day", pa.string())])
+PARTITIONING = ds.partitioning(PARTITION_SCHEMA, flavor="hive")
+
+
+def default_archive_path() -> str:
+    """Get the archive root directory from the environment."""
+    return os.getenv("ARCHIVE_PATH", "/opt/airflow/archive")
+
+
+class SnapshotArchiver:
+    """Move old superseded raw snapshots from `bmrs_datasets` into compressed Parquet files.
+
+    - Only snapshots with a newer successful snapshot of the same (data_type, window) are archived, so the table
+      keeps the latest snapshot of every window the gap planner, full refreshes and reprocessing rely on.
+    - Files are partitioned by `data_type` and ingestion day.
+    - Rows are deleted from the hot table only after their partition file is written.
+    """
+
+    def __init__(self, db: Session, root: str | None = None, compression: str = "zstd"):
+        """Initialize the archiver.
+
+        :param db: SQLAlchemy session used to read and delete snapshots.
+        :param root: Archive root directory. Default is the `ARCHIVE_PATH` environment variable.
+        :param compression: Parquet compression codec. Default is zstd.
+        """
+        self.db = db
+        self.root = root or default_archive_path()
+        self.compression = compression
+
+    @staticmethod
+    def to_table(rows: list[dict[str, Any]]) -> pa.Table:
+        """Convert snapshot rows into an Arrow table.
+
+        :param rows: Snapshot rows keyed by column name.
+        :return: Arrow table with the archive schema.
+        """
+        columns: dict[str, list[Any]] = {name: [] for name in SCHEMA.names}
+        for row in rows:
+            for name in SCHEMA.names:
+                value = row[name]
+                columns[name].append(str(value) if name == "id" else value)
+
+        return pa.table(columns, schema=SCHEMA)
+
+    def write_partition(self, data_type: str, day: str, rows: list[dict[str, Any]]) -> str:
+        """Write one partition file.
+
+        :param data_type: The dataset type of the rows.
+        :param day: Ingestion day of the rows as `YYYY-MM-DD`.
+        :param rows: Snapshot rows keyed by column name.
+        :return: Path of the written file.
+        """
+        directory = os.path.join(self.root, f"data_type={data_type}", f"day={day}")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"part-{uuid.uuid4().hex}.parquet")
+        pq.write_table(self.to_table(rows), path, compression=self.compression)
+
+        return path
+
+    @staticmethod
+    def superseded() -> ColumnElement[bool]:
+        """Build the condition for a snapshot with a newer successful snapshot of the same window."""
+        newer = aliased(BmrsDataset)
+
+        return exists().where(
+            newer.data_type == BmrsDataset.data_type,
+            newer.window_from_utc == BmrsDataset.window_from_utc,
+            newer.window_to_utc == BmrsDataset.window_to_utc,
+            newer.http_status == http.HTTPStatus.OK,
+            newer.ingestion_ts > BmrsDataset.ingestion_ts,
+        )
+
+    def partitions(self, cutoff: datetime) -> list[tuple[str, str]]:
+        """List the (data_type, day) partitions holding superseded snapshots older than the cutoff.
+
+        :param cutoff: Snapshots ingested before this time are archived.
+        :return: Ordered list of (data_type, day) pairs.
+        """
+        day = func.to_char(func.timezone("UTC", BmrsDataset.ingestion_ts), "YYYY-MM-DD")
+        stmt = (
+            select(BmrsDataset.data_type, day)
+            .where(BmrsDataset.ingestion_ts < cutoff, self.superseded())  # type: ignore[arg-type]
+            .group_by(BmrsDataset.data_type, day)
+            .order_by(day, BmrsDataset.data_type)
+        )
+
+        return [(data_type, partition_day) for data_type, partition_day in self.db.execute(stmt)]
+
+    def archive(self, min_age: pendulum.Duration, now: pendulum.DateTime | None = None) -> int:
+        """Archive and delete superseded snapshots older than the given age, one partition per transaction.
+
+        :param min_age: Minimum age of a snapshot before it is archived.
+        :param now: Reference time for the age. Default is the current time.
+        :return: Number of archived snapshots.
+        """
+        cutoff = (now or pendulum.now(tz="UTC")) - min_age
+        columns = [getattr(BmrsDataset, name) for name in SCHEMA.names]
+        archived = 0
+
+        for data_type, day in self.partitions(cutoff):
+            day_start = pendulum.from_format(day, "YYYY-MM-DD", tz="UTC")
+            stmt = select(*columns).where(
+                BmrsDataset.data_type == data_type,
+                BmrsDataset.ingestion_ts >= day_start,  # type: ignore[arg-type]
+                BmrsDataset.ingestion_ts < min(day_start.add(days=1), cutoff),  # type: ignore[arg-type]
+                self.superseded(),
+            )
+            rows = [dict(row._mapping) for row in self.db.execute(stmt)]
+            if not rows:
+                continue
+
+            path = self.write_partition(data_type, day, rows)
+            try:
+                self.db.execute(delete(BmrsDataset).where(BmrsDataset.id.in_([row["id"] for row in rows])))
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                os.remove(path)
+                raise
+            archived += len(rows)
+
+        return archived
+
+
+class SnapshotArchive:
+    """Read archived raw snapshots back for full refreshes and audits."""
+
+    def __init__(self, root: str | None = None):
+        """Initialize the reader.
+
+        :param root: Archive root directory. Default is the `ARCHIVE_PATH` environment variable.
+        """
+        self.root = root or default_archive_path()
+
+    def dataset(self) -> ds.Dataset:
+        """Open the archive as a hive-partitioned Arrow dataset."""
+        return ds.dataset(
+            self.root,
+            format="parquet",
+            partitioning=PARTITIONING,
+            schema=pa.unify_schemas([SCHEMA, PARTITION_SCHEMA]),
+        )
+
+    def scan(
+        self,
+        data_type: str,
+        day_from: str | None = None,
+        day_to: str | None = None,
+        batch_size: int = 1024,
+    ) -> Iterator[pa.RecordBatch]:
+        """Stream archived snapshots as record batches, pruning partitions by type and day.
+
+        :param data_type: The dataset type to read.
+        :param day_from: First ingestion day to read as `YYYY-MM-DD`, inclusive.
+        :param day_to: Last ingestion day to read as `YYYY-MM-DD`, inclusive.
+        :param batch_size: Maximum rows per batch.
+        :return: Iterator of record batches.
+        """
+        if not os.path.isdir(self.root):
+            return
+
+        condition = ds.field("data_type") == data_type
+        if day_from:
+            condition = condition & (ds.field("day") >= day_from)
+        if day_to:
+            condition = condition & (ds.field("day") <= day_to)
+
+        yield from self.dataset().to_batches(filter=condition, batch_size=batch_size)
+
+    def rehydrate(self, db: Session, data_type: str, day_from: str | None = None, day_to: str | None = None) -> int:
+        """Insert archived snapshots back into `bmrs_datasets`, skipping ids that already exist.
+
+        :param db: SQLAlchemy session used to insert the snapshots.
+        :param data_type: The dataset type to restore.
+        :param day_from: First ingestion day to restore as `YYYY-MM-DD`, inclusive.
+        :param day_to: Last ingestion day to restore as `YYYY-MM-DD`, inclusive.
+        :return: Number of snapshots read from the archive.
+        """
+        restored = 0
+        for batch in self.scan(data_type, day_from, day_to):
+            records = [{name: row[name] for name in SCHEMA.names} | {"id": uuid.UUID(row["id"]), "data_type": data_type} for row in batch.to_pylist()]
+            db.execute(insert(BmrsDataset).values(records).on_conflict_do_nothing(index_elements=["id"]))
+            db.commit()
+            restored += len(records)
+
+        return restored
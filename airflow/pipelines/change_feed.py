@@ -0,0 +1,61 @@
+from collections.abc import Iterator
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+
+class ChangeFeed:
+    """Read the mart change feed incrementally.
+
+    - A consumer keeps the last `change_seq` it processed as its cursor and asks for the changes after it.
+    """
+
+    TABLE = "mart.wind_and_solar_power_changes"
+
+    CHANGES_SQL = """
+        select change_seq, start_time, psr_type, change_type, old_quantity, new_quantity, changed_at
+        from {table}
+        where change_seq > :cursor
+        order by change_seq
+        limit :limit
+    """
+
+    def __init__(self, db: Session, page_size: int = 1000):
+        """Initialize the reader.
+
+        :param db: SQLAlchemy session used to read the feed.
+        :param page_size: Maximum changes read per query. Default is 1000.
+        """
+        self.db = db
+        self.page_size = page_size
+
+    def changes(self, cursor: int = 0, limit: int | None = None) -> list[dict[str, Any]]:
+        """Read one page of changes after the cursor.
+
+        :param cursor: The last `change_seq` already processed. Default is 0, the start of the feed.
+        :param limit: Maximum changes to return. Default is the page size.
+        :return: Changes ordered by `change_seq`.
+        """
+        rows = self.db.execute(
+            text(ChangeFeed.CHANGES_SQL.format(table=ChangeFeed.TABLE)),
+            {"cursor": cursor, "limit": limit or self.page_size},
+        )
+
+        return [dict(row._mapping) for row in rows]
+
+    def stream(self, cursor: int = 0) -> Iterator[list[dict[str, Any]]]:
+        """Yield pages of changes after the cursor until the feed is drained.
+
+        :param cursor: The last `change_seq` already processed. Default is 0, the start of the feed.
+        :return: Iterator of change pages.
+        """
+        while True:
+            page = self.changes(cursor)
+            if not page:
+                return
+
+            yield page
+            cursor = page[-1]["change_seq"]
+            if len(page) < self.page_size:
+                return
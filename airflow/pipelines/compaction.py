@@ -0,0 +1,128 @@
+import logging
+from datetime import datetime
+
+import pendulum
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger("pipelines.compaction")
+
+# Postgres error code raised when `lock_timeout` expires.
+LOCK_NOT_AVAILABLE = "55P03"
+
+
+class SnapshotCompactor:
+    """Delete superseded raw snapshots from `bmrs_datasets` once their window has settled.
+
+    - The latest snapshot of every (data_type, window) is always kept.
+    - An older snapshot is kept when its payload differs from the next newer one, so every revision survives.
+    - Each data type is scanned one day of `window_from_utc` at a time on the window index, so no lookup reaches across the whole table.
+    - Deletes run in small batches, each in its own short transaction, so ingestion is never blocked.
+    - A batch that hits the lock timeout is rolled back and the run stops early; the next run picks up the rest.
+    """
+
+    # Span of window starts scanned per lookup.
+    SCAN_RANGE = pendulum.duration(days=1)
+
+    # A snapshot is redundant when the next newer snapshot of the same window carries the same payload.
+    REDUNDANT_SQL = """
+        with ordered as (
+            select
+                id,
+                window_from_utc,
+                md5(coalesce(payload_json, '')) as digest,
+                lead(md5(coalesce(payload_json, ''))) over (
+                    partition by data_type, window_from_utc, window_to_utc
+                    order by ingestion_ts, id
+                ) as next_digest
+            from bmrs_datasets
+            where data_type = :data_type
+                and window_from_utc >= :after
+                and window_from_utc < :until
+                and window_to_utc < :cutoff
+        )
+        select id, window_from_utc
+        from ordered
+        where digest = next_digest
+        order by window_from_utc
+        limit :batch_size
+    """
+
+    OLDEST_WINDOWS_SQL = """
+        select data_type, min(window_from_utc)
+        from bmrs_datasets
+        where window_to_utc < :cutoff
+        group by data_type
+    """
+
+    DELETE_SQL = "delete from bmrs_datasets where id = any(cast(:ids as uuid[]))"
+
+    def __init__(self, db: Session, batch_size: int = 5000, lock_timeout: str = "2s"):
+        """Initialize the compactor.
+
+        :param db: SQLAlchemy session used to find and delete snapshots.
+        :param batch_size: Maximum snapshots deleted per transaction. Default is 5000.
+        :param lock_timeout: Roll back a batch and stop the run rather than wait longer on locks. Default is 2s.
+        """
+        self.db = db
+        self.batch_size = batch_size
+        self.lock_timeout = lock_timeout
+
+    def compact(self, settle_after: pendulum.Duration, now: pendulum.DateTime | None = None) -> int:
+        """Delete superseded snapshots of every window settled before `now - settle_after`.
+
+        :param settle_after: Time after a window ends before it is compacted.
+        :param now: Reference time for the settling period. Default is the current time.
+        :return: Number of deleted snapshots.
+        """
+        cutoff = (now or pendulum.now(tz="UTC")) - settle_after
+        oldest = self.db.execute(text(SnapshotCompactor.OLDEST_WINDOWS_SQL), {"cutoff": cutoff}).all()
+        deleted = 0
+
+        for data_type, window_from in oldest:
+            compacted, finished = self.compact_data_type(data_type, pendulum.instance(window_from), cutoff)
+            deleted += compacted
+            if not finished:
+                logger.warning("Compaction stopped early on a lock timeout after %s deletes", deleted)
+                break
+
+        return deleted
+
+    def compact_data_type(self, data_type: str, after: datetime, cutoff: datetime) -> tuple[int, bool]:
+        """Delete superseded snapshots of one data type, one range of window starts at a time.
+
+        :param data_type: The data type to compact.
+        :param after: Start of the first scanned range, the oldest settled window.
+        :param cutoff: Windows ending before this time are compacted.
+        :return: Number of deleted snapshots and False when a lock timeout stopped the run.
+        """
+        until = after + SnapshotCompactor.SCAN_RANGE
+        deleted = 0
+
+        while after < cutoff:
+            try:
+                self.db.execute(text("select set_config('lock_timeout', :timeout, true)"), {"timeout": self.lock_timeout})
+                rows = self.db.execute(
+                    text(SnapshotCompactor.REDUNDANT_SQL),
+                    {"data_type": data_type, "cutoff": cutoff, "after": after, "until": until, "batch_size": self.batch_size},
+                ).all()
+                if rows:
+                    self.db.execute(text(SnapshotCompactor.DELETE_SQL), {"ids": [str(row[0]) for row in rows]})
+                self.db.commit()
+            except OperationalError as e:
+                if getattr(e.orig, "pgcode", None) != LOCK_NOT_AVAILABLE:
+                    raise
+                self.db.rollback()
+                return deleted, False
+
+            deleted += len(rows)
+            if len(rows) < self.batch_size:
+                # The scanned range is fully compacted.
+                after = until
+                until = after + SnapshotCompactor.SCAN_RANGE
+            else:
+                # Windows before the last one in the batch are fully compacted.
+                after = rows[-1][1]
+
+        return deleted, True
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, Integer, Text, text
+from sqlalchemy import Column, DateTime, Index, Integer, Text, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import DeclarativeMeta, declarative_base
 
@@ -9,6 +9,14 @@ class BmrsDataset(Base):
     """Raw BMRS dataset ingestion table."""
 
     __tablename__ = "bmrs_datasets"
+    __table_args__ = (
+        Index(
+            "ix_bmrs_datasets_data_type_window",
+            "data_type",
+            "window_from_utc",
+            "window_to_utc",
+        ),
+    )
 
     id = Column(
         UUID(as_uuid=True),
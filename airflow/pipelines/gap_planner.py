@@ -0,0 +1,189 @@
+from typing import Any
+
+import pendulum
+from pipelines.helper import Helper
+from pipelines.revision_tracker import RevisionTracker
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+SLOT = pendulum.duration(minutes=30)
+
+
+class GapPlanner:
+    """Plan the minimal set of fetch windows needed to fill gaps in the ingested data.
+
+    - A slot is missing when no successful raw snapshot covers it.
+    - A slot is incomplete when the mart does not hold every expected PSR type for it.
+    - A slot is stale when a revision tracker, if given, measured revisions at an age it passed since its last fetch.
+    """
+
+    DATA_TYPE = "wind_and_solar_power"
+    PSR_TYPES = ("Solar", "Wind Offshore", "Wind Onshore")
+    MART_TABLE = "mart.wind_and_solar_power"
+
+    # Latest successful snapshot per slot, expanded from each snapshot's request window.
+    # No window spans more than the validator's 7 days, which bounds the index scan from below.
+    LATEST_SNAPSHOT_SQL = """
+        select slots.slot_start, max(raw.ingestion_ts) as ingestion_ts
+        from bmrs_datasets as raw
+        cross join lateral generate_series(
+            greatest(raw.window_from_utc, :date_from),
+            least(raw.window_to_utc, :date_to),
+            interval '30 minutes'
+        ) as slots (slot_start)
+        where raw.data_type = :data_type
+            and raw.http_status = 200
+            and raw.window_from_utc <= :date_to
+            and raw.window_from_utc >= cast(:date_from as timestamptz) - interval '7 days'
+            and raw.window_to_utc >= :date_from
+        group by slots.slot_start
+    """
+
+    # Slots that already hold every expected PSR type in the mart.
+    COMPLETE_SLOTS_SQL = """
+        select start_time
+        from {table}
+        where start_time between :date_from and :date_to
+        group by start_time
+        having count(distinct psr_type) >= :psr_count
+    """
+
+    def __init__(self, db: Session, tracker: RevisionTracker | None = None, max_days: int = 7):
+        """Initialize the planner.
+
+        :param db: SQLAlchemy session used for the lookups.
+        :param tracker: Revision tracker used to find stale slots. Default is None, no staleness check.
+        :param max_days: The maximum number of days a single fetch window may span. Default is 7.
+        """
+        self.db = db
+        self.tracker = tracker
+        self.max_days = max_days
+
+    @staticmethod
+    def expected_slots(date_from: pendulum.DateTime, date_to: pendulum.DateTime) -> list[pendulum.DateTime]:
+        """Build the 30-minute slot grid between two datetimes, both ends inclusive.
+
+        :param date_from: The start date time of the time period.
+        :param date_to: The end date time of the time period.
+        :return: Ordered list of slot start times.
+        """
+        slot = Helper.floor_to_30_min(date_from)
+        end = Helper.floor_to_30_min(date_to)
+        slots = []
+        while slot <= end:
+            slots.append(slot)
+            slot = slot + SLOT
+
+        return slots
+
+    @staticmethod
+    def find_gaps(
+        expected: list[pendulum.DateTime],
+        latest_snapshot: dict[pendulum.DateTime, pendulum.DateTime],
+        complete: set[pendulum.DateTime],
+        stale: set[pendulum.DateTime],
+    ) -> list[pendulum.DateTime]:
+        """Select the slots that must be fetched again.
+
+        :param expected: The expected slot grid.
+        :param latest_snapshot: Latest ingestion time keyed by slot start.
+        :param complete: Slots that hold every expected PSR type in the mart.
+        :param stale: Slots expected to have been revised since their last fetch.
+        :return: Ordered list of slot start times to fetch.
+        """
+        return [slot for slot in expected if slot not in latest_snapshot or slot not in complete or slot in stale]
+
+    def stale_slots(self, expected: list[pendulum.DateTime], now: pendulum.DateTime) -> set[pendulum.DateTime]:
+        """Ask the revision tracker which slots of the grid are likely to have been revised.
+
+        Only slots with measured revision evidence count; the tracker's exploration sample is left to the scheduled run.
+
+        :param expected: The expected slot grid.
+        :param now: Reference time for the slot ages.
+        :return: Set of stale slot start times, empty without a tracker.
+        """
+        if self.tracker is None:
+            return set()
+
+        observations = self.tracker.observations(now - RevisionTracker.HISTORY)
+        refetch = self.tracker.refetch_slots(observations, expected[-1] + SLOT, now, explore=False)
+
+        return set(refetch) & set(expected)
+
+    def merge_windows(self, slots: list[pendulum.DateTime]) -> list[dict[str, Any]]:
+        """Merge adjacent slots into the fewest fetch windows within the days limit.
+
+        :param slots: Ordered slot start times.
+        :return: List of windows with `date_from` and `date_to` keys.
+        """
+        windows: list[dict[str, Any]] = []
+        for slot in slots:
+            if windows:
+                last = windows[-1]
+                if slot - last["date_to"] == SLOT and slot.diff(last["date_from"]).in_days() < self.max_days:
+                    last["date_to"] = slot
+                    continue
+            windows.append({"date_from": slot, "date_to": slot})
+
+        return windows
+
+    def latest_snapshots(self, date_from: pendulum.DateTime, date_to: pendulum.DateTime) -> dict[pendulum.DateTime, pendulum.DateTime]:
+        """Fetch the latest successful snapshot time for every covered slot.
+
+        :param date_from: The start date time of the time period.
+        :param date_to: The end date time of the time period.
+        :return: Latest ingestion time keyed by slot start.
+        """
+        rows = self.db.execute(
+            text(GapPlanner.LATEST_SNAPSHOT_SQL),
+            {"date_from": date_from, "date_to": date_to, "data_type": GapPlanner.DATA_TYPE},
+        )
+
+        return {pendulum.instance(slot): pendulum.instance(ingested) for slot, ingested in rows}
+
+    def complete_slots(self, date_from: pendulum.DateTime, date_to: pendulum.DateTime) -> set[pendulum.DateTime]:
+        """Fetch the slots holding every expected PSR type in the mart.
+
+        :param date_from: The start date time of the time period.
+        :param date_to: The end date time of the time period.
+        :return: Set of complete slot start times.
+        """
+        rows = self.db.execute(
+            text(GapPlanner.COMPLETE_SLOTS_SQL.format(table=GapPlanner.MART_TABLE)),
+            {"date_from": date_from, "date_to": date_to, "psr_count": len(GapPlanner.PSR_TYPES)},
+        )
+
+        return {pendulum.instance(slot) for (slot,) in rows}
+
+    def plan(
+        self,
+        date_from: pendulum.DateTime,
+        date_to: pendulum.DateTime,
+        now: pendulum.DateTime | None = None,
+    ) -> list[dict[str, str]]:
+        """Plan the fetch windows for a time period.
+
+        :param date_from: The start date time of the time period.
+        :param date_to: The end date time of the time period.
+        :param now: Reference time for the staleness check. Default is the current time.
+        :return: List of DAG run params with ISO8601 `date_from` and `date_to` values.
+        """
+        now = now or pendulum.now(tz="UTC")
+        expected = self.expected_slots(date_from, date_to)
+        if not expected:
+            return []
+
+        gaps = self.find_gaps(
+            expected,
+            self.latest_snapshots(expected[0], expected[-1]),
+            self.complete_slots(expected[0], expected[-1]),
+            self.stale_slots(expected, now),
+        )
+
+        return [
+            {
+                "date_from": window["date_from"].to_iso8601_string(),
+                "date_to": window["date_to"].to_iso8601_string(),
+            }
+            for window in self.merge_windows(gaps)
+        ]
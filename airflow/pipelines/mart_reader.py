@@ -0,0 +1,150 @@
+from collections import OrderedDict
+from collections.abc import Iterator, Sequence
+
+import pendulum
+import pyarrow as pa
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+SCHEMA = pa.schema(
+    [
+        ("start_time", pa.timestamp("us", tz="UTC")),
+        ("psr_type", pa.string()),
+        ("quantity", pa.float64()),
+    ],
+)
+
+
+class MartReader:
+    """Read `mart.wind_and_solar_power` in fixed-size Arrow batches with bounded memory.
+
+    - Rows are streamed through a server-side cursor, so only one chunk is held at a time.
+    - Settled days can be kept in an in-process LRU cache, as they no longer change.
+    - Batches convert to NumPy with `batch.column("quantity").to_numpy()`.
+    """
+
+    TABLE = "mart.wind_and_solar_power"
+
+    ROWS_SQL = """
+        select start_time, psr_type, quantity::double precision as quantity
+        from {table}
+        where start_time >= :date_from
+            and start_time < :date_to
+            {psr_filter}
+        order by start_time, psr_type
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        chunk_size: int = 10000,
+        cache_days: int = 0,
+        settle_after: pendulum.Duration | None = None,
+    ):
+        """Initialize the reader.
+
+        :param db: SQLAlchemy session used to query the mart.
+        :param chunk_size: Rows per batch. Default is 10000.
+        :param cache_days: Number of settled days kept in the LRU cache. Default is 0, no caching.
+        :param settle_after: Time after a day ends before it is treated as immutable. Default is 2 days.
+        """
+        self.db = db
+        self.chunk_size = chunk_size
+        self.cache_days = cache_days
+        self.settle_after = settle_after if settle_after is not None else pendulum.duration(days=2)
+        self._cache: OrderedDict[tuple[pendulum.DateTime, tuple[str, ...]], pa.Table] = OrderedDict()
+
+    def stream(
+        self,
+        date_from: pendulum.DateTime,
+        date_to: pendulum.DateTime,
+        psr_types: Sequence[str] | None = None,
+    ) -> Iterator[pa.RecordBatch]:
+        """Stream rows of a time range from the database.
+
+        :param date_from: Start of the range, inclusive.
+        :param date_to: End of the range, exclusive.
+        :param psr_types: Power generation types to read. Default is all types.
+        :return: Iterator of record batches.
+        """
+        params: dict[str, object] = {"date_from": date_from, "date_to": date_to}
+        psr_filter = ""
+        if psr_types:
+            psr_filter = "and psr_type = any(:psr_types)"
+            params["psr_types"] = list(psr_types)
+
+        result = self.db.execute(
+            text(MartReader.ROWS_SQL.format(table=MartReader.TABLE, psr_filter=psr_filter)),
+            params,
+            execution_options={"stream_results": True, "yield_per": self.chunk_size},
+        )
+        for rows in result.partitions():
+            yield pa.RecordBatch.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(zip(*rows, strict=True), SCHEMA, strict=True)],
+                schema=SCHEMA,
+            )
+
+    def cached_day(self, day: pendulum.DateTime, psr_types: tuple[str, ...]) -> pa.Table:
+        """Read a settled day through the LRU cache.
+
+        :param day: Start of the day.
+        :param psr_types: Power generation types to read, empty for all types.
+        :return: The day's rows.
+        """
+        key = (day, psr_types)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        table = pa.Table.from_batches(list(self.stream(day, day.add(days=1), psr_types)), schema=SCHEMA)
+        self._cache[key] = table
+        if len(self._cache) > self.cache_days:
+            self._cache.popitem(last=False)
+
+        return table
+
+    def batches(
+        self,
+        date_from: pendulum.DateTime,
+        date_to: pendulum.DateTime,
+        psr_types: Sequence[str] | None = None,
+        now: pendulum.DateTime | None = None,
+    ) -> Iterator[pa.RecordBatch]:
+        """Read a time range in chunks, serving whole settled days from the cache when enabled.
+
+        :param date_from: Start of the range, inclusive.
+        :param date_to: End of the range, exclusive.
+        :param psr_types: Power generation types to read. Default is all types.
+        :param now: Reference time used to decide if a day has settled. Default is the current time.
+        :return: Iterator of record batches of at most `chunk_size` rows.
+        """
+        if not self.cache_days:
+            yield from self.stream(date_from, date_to, psr_types)
+            return
+
+        settled_before = (now or pendulum.now(tz="UTC")) - self.settle_after
+        types = tuple(sorted(psr_types or ()))
+        start = date_from
+        while start < date_to:
+            day = start.start_of("day")
+            end = min(day.add(days=1), date_to)
+            if start == day and end == day.add(days=1) and end <= settled_before:
+                yield from self.cached_day(day, types).to_batches(max_chunksize=self.chunk_size)
+            else:
+                yield from self.stream(start, end, psr_types)
+            start = end
+
+    def read(
+        self,
+        date_from: pendulum.DateTime,
+        date_to: pendulum.DateTime,
+        psr_types: Sequence[str] | None = None,
+    ) -> pa.Table:
+        """Read a time range into a single Arrow table.
+
+        :param date_from: Start of the range, inclusive.
+        :param date_to: End of the range, exclusive.
+        :param psr_types: Power generation types to read. Default is all types.
+        :return: Arrow table of the range.
+        """
+        return pa.Table.from_batches(list(self.batches(date_from, date_to, psr_types)), schema=SCHEMA)
@@ -0,0 +1,43 @@
+from datetime import date, datetime
+from typing import Annotated
+
+import msgspec
+
+NonEmptyStr = Annotated[str, msgspec.Meta(min_length=1)]
+SettlementPeriod = Annotated[int, msgspec.Meta(ge=1, le=50)]
+
+
+class GenerationItem(msgspec.Struct, rename="camel", frozen=True):
+    """A single wind or solar generation reading from the API payload."""
+
+    start_time: datetime
+    psr_type: NonEmptyStr
+    quantity: float
+    settlement_date: date
+    settlement_period: SettlementPeriod
+    publish_time: datetime | None = None
+    business_type: str | None = None
+
+
+class WindSolarPayload(msgspec.Struct, frozen=True):
+    """The wind and solar generation API payload."""
+
+    data: list[GenerationItem]
+
+
+class PayloadDecoder:
+    """Decode and validate raw wind and solar payloads in a single pass.
+
+    - Malformed items raise `msgspec.ValidationError` instead of surfacing later in the dbt casts.
+    """
+
+    _decoder = msgspec.json.Decoder(WindSolarPayload)
+
+    @staticmethod
+    def decode(raw: bytes | str) -> WindSolarPayload:
+        """Decode the raw JSON payload into typed structs.
+
+        :param raw: Raw JSON payload.
+        :return: The typed payload.
+        """
+        return PayloadDecoder._decoder.decode(raw)
@@ -0,0 +1,348 @@
+"""Rebuild the wind and solar mart from raw snapshot history across multiple cores.
+
+Usage:
+    python -m pipelines.reprocess --date-from 2025-01-01T00:00:00Z --date-to 2025-06-01T00:00:00Z --workers 8
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from datetime import datetime
+from typing import cast
+
+import msgspec
+import pendulum
+from pipelines.helper import Helper
+from pipelines.payload import PayloadDecoder
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger("pipelines.reprocess")
+
+SNAPSHOTS_FILTER = """
+    from bmrs_datasets
+    where data_type = 'wind_and_solar_power'
+        and http_status = 200
+        and payload_json is not null
+        and ingestion_ts >= :date_from
+        and ingestion_ts < :date_to
+"""
+
+SNAPSHOTS_SQL = f"select payload_json {SNAPSHOTS_FILTER} order by ingestion_ts, window_to_utc, id"
+
+COUNT_SQL = f"select count(*) {SNAPSHOTS_FILTER}"
+
+# Upper bound of a sized batch, so a long chunk does not load too many payloads in one worker call.
+MAX_BATCH_SIZE = 500
+
+# Feed writers take this lock before reading max(change_seq), the dbt feed model in its pre-hook,
+# so they serialise until commit instead of assigning the same change_seq values.
+LOCK_SQL = "lock table {changes} in share row exclusive mode"
+
+STAGE_TABLE_SQL = """
+    create temporary table if not exists reprocess_rows (
+        start_time timestamptz,
+        psr_type text,
+        quantity numeric
+    ) on commit delete rows
+"""
+
+STAGE_SQL = "insert into reprocess_rows (start_time, psr_type, quantity) values (:start_time, :psr_type, :quantity)"
+
+# Skips keys covered by a snapshot ingested from :date_to on, which the mart already reflects,
+# and publishes every written row to the change feed like the dbt model does. No window spans more
+# than the validator's 7 days, which bounds the index scan for the newer snapshot from below.
+APPLY_SQL = """
+    with incoming as (
+        select staged.start_time, staged.psr_type, staged.quantity
+        from reprocess_rows as staged
+        where not exists (
+            select 1
+            from bmrs_datasets as raw
+            where raw.data_type = 'wind_and_solar_power'
+                and raw.http_status = 200
+                and raw.ingestion_ts >= :date_to
+                and raw.window_from_utc <= staged.start_time
+                and raw.window_from_utc >= staged.start_time - interval '7 days'
+                and raw.window_to_utc >= staged.start_time
+        )
+    ),
+
+    previous as (
+        select mart.start_time, mart.psr_type, mart.quantity
+        from {table} as mart
+        inner join incoming
+            on mart.start_time = incoming.start_time
+            and mart.psr_type = incoming.psr_type
+    ),
+
+    upserted as (
+        insert into {table} as mart (start_time, psr_type, quantity)
+        select start_time, psr_type, quantity
+        from incoming
+        on conflict (start_time, psr_type) do update set quantity = excluded.quantity
+        where mart.quantity is distinct from excluded.quantity
+        returning mart.start_time, mart.psr_type, mart.quantity
+    ),
+
+    published as (
+        insert into {changes} (change_seq, start_time, psr_type, change_type, old_quantity, new_quantity, changed_at)
+        select
+            (select coalesce(max(change_seq), 0) from {changes})
+            + row_number() over (order by upserted.start_time, upserted.psr_type),
+            upserted.start_time,
+            upserted.psr_type,
+            case when previous.quantity is null then 'insert' else 'revision' end,
+            previous.quantity,
+            upserted.quantity,
+            now()
+        from upserted
+        left join previous
+            on upserted.start_time = previous.start_time
+            and upserted.psr_type = previous.psr_type
+        returning change_seq
+    )
+
+    select count(*) from published
+"""
+
+
+def flatten(payloads: list[str]) -> tuple[list[tuple[datetime, str, float]], int]:
+    """Decode and flatten a batch of raw payloads in a worker process.
+
+    :param payloads: Raw JSON payloads ordered by ingestion.
+    :return: Flattened (start_time, psr_type, quantity) items and the number of malformed payloads.
+    """
+    items: list[tuple[datetime, str, float]] = []
+    malformed = 0
+    for payload in payloads:
+        try:
+            decoded = PayloadDecoder.decode(payload)
+        except msgspec.DecodeError:  # also raised for schema violations
+            malformed += 1
+            continue
+        items.extend((item.start_time, item.psr_type, item.quantity) for item in decoded.data)
+
+    return items, malformed
+
+
+def latest_per_key(items: list[tuple[datetime, str, float]], latest: dict[tuple[datetime, str], float]) -> None:
+    """Merge items into the last quantity per (start_time, psr_type), matching the mart's latest-snapshot rule.
+
+    :param items: Flattened items ordered by ingestion.
+    :param latest: Quantities per key merged so far, updated in place.
+    """
+    latest.update(((start_time, psr_type), quantity) for start_time, psr_type, quantity in items)
+
+
+def chunks(date_from: pendulum.DateTime, date_to: pendulum.DateTime, chunk: pendulum.Duration) -> Iterator[tuple[pendulum.DateTime, pendulum.DateTime]]:
+    """Split an ingestion range into consecutive checkpoint ranges.
+
+    :param date_from: Start of the ingestion range, inclusive.
+    :param date_to: End of the ingestion range, exclusive.
+    :param chunk: Length of each range.
+    :return: Iterator of (start, end) pairs.
+    """
+    start = date_from
+    while start < date_to:
+        end = min(start + chunk, date_to)
+        yield start, end
+        start = end
+
+
+class Checkpoint:
+    """Persist the end of the last fully written ingestion range so a rebuild can resume."""
+
+    def __init__(self, path: str, date_from: pendulum.DateTime, date_to: pendulum.DateTime):
+        """Initialize the checkpoint.
+
+        :param path: JSON file holding the checkpoint.
+        :param date_from: Start of the ingestion range being rebuilt.
+        :param date_to: End of the ingestion range being rebuilt.
+        """
+        self.path = path
+        self.date_from = date_from
+        self.date_to = date_to
+
+    def resume_from(self) -> pendulum.DateTime:
+        """Get where the rebuild should start, ignoring checkpoints of a different range."""
+        if not os.path.exists(self.path):
+            return self.date_from
+
+        with open(self.path) as f:
+            state = json.load(f)
+
+        if state["date_from"] != self.date_from.to_iso8601_string() or state["date_to"] != self.date_to.to_iso8601_string():
+            return self.date_from
+
+        return cast(pendulum.DateTime, pendulum.parse(state["completed_to"]))
+
+    def save(self, completed_to: pendulum.DateTime) -> None:
+        """Record that every snapshot before `completed_to` has been written.
+
+        :param completed_to: End of the last written range.
+        """
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(
+                {
+                    "date_from": self.date_from.to_iso8601_string(),
+                    "date_to": self.date_to.to_iso8601_string(),
+                    "completed_to": completed_to.to_iso8601_string(),
+                },
+                f,
+            )
+        os.replace(tmp, self.path)
+
+
+class Reprocessor:
+    """Stream raw snapshots with a server-side cursor, flatten them in a process pool and upsert the mart.
+
+    - Batches are sized from the snapshots in the range, so every in-flight slot has work even on short ranges.
+    - At most `max_in_flight` batches are queued in the pool, so memory stays bounded on long ranges.
+    - Keys covered by a snapshot ingested after the range are left alone, as the mart already holds a newer value.
+    - Written rows are appended to the change feed in the same transaction, so feed consumers see the rebuild.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        pool: Executor,
+        table: str = "mart.wind_and_solar_power",
+        batch_size: int | None = None,
+        max_in_flight: int = 2,
+    ):
+        """Initialize the reprocessor.
+
+        :param db: SQLAlchemy session used to read snapshots and write the mart.
+        :param pool: Process pool that decodes and flattens the payloads.
+        :param table: Target table with a unique (start_time, psr_type) index. Its change feed is `{table}_changes`.
+        :param batch_size: Snapshots per worker batch and per server-side cursor fetch. Default is sized per range.
+        :param max_in_flight: Batches submitted to the pool before the oldest result is awaited.
+        """
+        self.db = db
+        self.pool = pool
+        self.table = table
+        self.changes_table = f"{table}_changes"
+        self.batch_size = batch_size
+        self.max_in_flight = max_in_flight
+
+    def sized_batch(self, date_from: pendulum.DateTime, date_to: pendulum.DateTime) -> int:
+        """Get the batch size that spreads the snapshots of an ingestion range over every in-flight slot.
+
+        :param date_from: Start of the ingestion range, inclusive.
+        :param date_to: End of the ingestion range, exclusive.
+        :return: The configured batch size, or the range's snapshots divided by `max_in_flight`, capped at `MAX_BATCH_SIZE`.
+        """
+        if self.batch_size:
+            return self.batch_size
+
+        count: int = self.db.execute(text(COUNT_SQL), {"date_from": date_from, "date_to": date_to}).scalar_one()
+
+        return max(1, min(math.ceil(count / self.max_in_flight), MAX_BATCH_SIZE))
+
+    def batches(self, date_from: pendulum.DateTime, date_to: pendulum.DateTime) -> Iterator[list[str]]:
+        """Stream raw payloads of an ingestion range in batches.
+
+        :param date_from: Start of the ingestion range, inclusive.
+        :param date_to: End of the ingestion range, exclusive.
+        :return: Iterator of payload batches ordered by ingestion.
+        """
+        result = self.db.execute(
+            text(SNAPSHOTS_SQL),
+            {"date_from": date_from, "date_to": date_to},
+            execution_options={"stream_results": True, "yield_per": self.sized_batch(date_from, date_to)},
+        )
+        for partition in result.scalars().partitions():
+            yield list(partition)
+
+    def flattened(self, date_from: pendulum.DateTime, date_to: pendulum.DateTime) -> Iterator[tuple[list[tuple[datetime, str, float]], int]]:
+        """Flatten the batches of an ingestion range in the pool, keeping a bounded window of batches in flight.
+
+        :param date_from: Start of the ingestion range, inclusive.
+        :param date_to: End of the ingestion range, exclusive.
+        :return: Iterator of flattened items and malformed counts, in batch order.
+        """
+        in_flight: deque[Future[tuple[list[tuple[datetime, str, float]], int]]] = deque()
+        for batch in self.batches(date_from, date_to):
+            in_flight.append(self.pool.submit(flatten, batch))
+            if len(in_flight) >= self.max_in_flight:
+                yield in_flight.popleft().result()
+
+        while in_flight:
+            yield in_flight.popleft().result()
+
+    def run(self, date_from: pendulum.DateTime, date_to: pendulum.DateTime) -> tuple[int, int]:
+        """Rebuild one ingestion range in a single transaction.
+
+        :param date_from: Start of the ingestion range, inclusive.
+        :param date_to: End of the ingestion range, exclusive.
+        :return: Number of changed rows and number of malformed payloads.
+        """
+        latest: dict[tuple[datetime, str], float] = {}
+        malformed = 0
+        # results come back in batch order, so later snapshots still win in latest_per_key
+        for batch_items, batch_malformed in self.flattened(date_from, date_to):
+            latest_per_key(batch_items, latest)
+            malformed += batch_malformed
+
+        rows = [{"start_time": start_time, "psr_type": psr_type, "quantity": quantity} for (start_time, psr_type), quantity in latest.items()]
+        written = 0
+        if rows:
+            self.db.execute(text(LOCK_SQL.format(changes=self.changes_table)))
+            self.db.execute(text(STAGE_TABLE_SQL))
+            self.db.execute(text(STAGE_SQL), rows)
+            written = self.db.execute(
+                text(APPLY_SQL.format(table=self.table, changes=self.changes_table)),
+                {"date_to": date_to},
+            ).scalar_one()
+        self.db.commit()
+
+        return written, malformed
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse the command-line arguments."""
+    parser = argparse.ArgumentParser(prog="python -m pipelines.reprocess", description=__doc__.splitlines()[0] if __doc__ else None)
+    parser.add_argument("--date-from", required=True, help="Start of the ingestion_ts range, inclusive (ISO8601)")
+    parser.add_argument("--date-to", required=True, help="End of the ingestion_ts range, exclusive (ISO8601)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes. Default is the CPU count")
+    parser.add_argument("--batch-size", type=int, help="Snapshots per worker batch. Default is sized from each chunk and the workers")
+    parser.add_argument("--chunk-hours", type=int, default=24, help="Hours of ingestion per checkpoint. Default is 24")
+    parser.add_argument("--checkpoint", default="reprocess.checkpoint.json", help="Checkpoint file used to resume")
+    parser.add_argument("--table", default="mart.wind_and_solar_power", help="Target table. Default is the mart")
+
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the rebuild from the command line."""
+    logging.basicConfig(level=os.getenv("logging_level", "INFO"))
+    args = parse_args(argv)
+    date_from = cast(pendulum.DateTime, pendulum.parse(args.date_from))
+    date_to = cast(pendulum.DateTime, pendulum.parse(args.date_to))
+    checkpoint = Checkpoint(args.checkpoint, date_from, date_to)
+
+    engine = create_engine(Helper.database_url(), future=True, pool_pre_ping=True)
+
+    with Session(engine) as db, ProcessPoolExecutor(max_workers=args.workers) as pool:
+        reprocessor = Reprocessor(
+            db,
+            pool,
+            table=args.table,
+            batch_size=args.batch_size,
+            max_in_flight=2 * args.workers,
+        )
+        for start, end in chunks(checkpoint.resume_from(), date_to, pendulum.duration(hours=args.chunk_hours)):
+            written, malformed = reprocessor.run(start, end)
+            checkpoint.save(end)
+            logger.info("Reprocessed %s to %s: %s rows changed, %s malformed payloads skipped", start, end, written, malformed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+import zlib
+from datetime import datetime
+
+import pendulum
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+SLOT = pendulum.duration(minutes=30)
+
+
+class RevisionTracker:
+    """Choose which older slots are worth refetching from how often and how late slots get revised.
+
+    - A revision is a snapshot whose per-slot digest differs from the previous snapshot of the same slot.
+    - A slot is only considered again once it passes a probe age, e.g. 4 hours after it starts, it was not fetched at.
+    - A small sample of slots is always probed, so the revision rate at every probe age stays measured.
+    - A range call is only extended back while the expected revisions per added slot reach the threshold.
+    """
+
+    DATA_TYPE = "wind_and_solar_power"
+    # How far back snapshots are used to learn the revision pattern.
+    HISTORY = pendulum.duration(days=7)
+    # Probes needed at an age before its revision rate is trusted.
+    MIN_SAMPLES = 5
+
+    # One row per (slot, snapshot) with a flag for a changed digest since the previous snapshot.
+    OBSERVATIONS_SQL = """
+        with items as (
+            select
+                raw.id,
+                raw.ingestion_ts,
+                (generation_items.generation_item ->> 'startTime')::timestamptz as slot_start,
+                (generation_items.generation_item ->> 'psrType')
+                || '=' || (generation_items.generation_item ->> 'quantity') as reading
+            from bmrs_datasets as raw
+            cross join
+                lateral jsonb_array_elements(raw.payload_json::jsonb -> 'data')
+                    as generation_items (generation_item)
+            where raw.data_type = :data_type
+                and raw.http_status = 200
+                and raw.ingestion_ts >= :since
+        ),
+
+        digests as (
+            select slot_start, id, ingestion_ts, md5(string_agg(reading, ',' order by reading)) as digest
+            from items
+            group by slot_start, id, ingestion_ts
+        ),
+
+        successive as (
+            select
+                slot_start,
+                ingestion_ts,
+                digest,
+                lag(digest) over (partition by slot_start order by ingestion_ts, id) as previous_digest
+            from digests
+        )
+
+        select slot_start, ingestion_ts, coalesce(digest <> previous_digest, false) as revised
+        from successive
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        max_lookback: pendulum.Duration | None = None,
+        threshold: float = 0.05,
+        probe_ages: tuple[pendulum.Duration, ...] | None = None,
+        sample_rate: float = 0.1,
+    ):
+        """Initialize the tracker.
+
+        :param db: SQLAlchemy session used to read the snapshot history.
+        :param max_lookback: The oldest slot age considered for a refetch. Default is 24 hours.
+        :param threshold: Minimum expected revisions per refetched slot. Default is 0.05.
+        :param probe_ages: Slot ages at which a refetch is considered. Default is 4 and 12 hours.
+        :param sample_rate: Share of slots always probed to keep the revision rates measured. Default is 0.1.
+        """
+        self.db = db
+        self.max_lookback = max_lookback if max_lookback is not None else pendulum.duration(hours=24)
+        self.threshold = threshold
+        self.probe_ages = sorted(probe_ages if probe_ages is not None else (pendulum.duration(hours=4), pendulum.duration(hours=12)))
+        self.sample_rate = sample_rate
+
+    def observations(self, since: datetime) -> list[tuple[datetime, datetime, bool]]:
+        """Read the per-slot snapshot history.
+
+        :param since: Only snapshots ingested after this time are read.
+        :return: List of (slot_start, ingestion_ts, revised) tuples.
+        """
+        rows = self.db.execute(
+            text(RevisionTracker.OBSERVATIONS_SQL),
+            {"data_type": RevisionTracker.DATA_TYPE, "since": since},
+        )
+
+        return [(slot, ingested, revised) for slot, ingested, revised in rows]
+
+    def sampled(self, slot: datetime) -> bool:
+        """Decide deterministically if a slot belongs to the exploration sample.
+
+        :param slot: Slot start time.
+        :return: True when the slot is always probed.
+        """
+        return zlib.crc32(slot.isoformat().encode()) % 10000 < self.sample_rate * 10000
+
+    def probe_index(self, age: float) -> int | None:
+        """Get the latest probe age reached by a slot age.
+
+        :param age: Slot age in seconds.
+        :return: Index into the probe ages, or None before the first probe age.
+        """
+        reached = [i for i, probe in enumerate(self.probe_ages) if probe.total_seconds() <= age]
+
+        return reached[-1] if reached else None
+
+    def revision_rates(self, observations: list[tuple[datetime, datetime, bool]]) -> list[float | None]:
+        """Measure the share of refetches at each probe age that found a revision.
+
+        Only refetches whose previous fetch came before the probe age count, so a rate is the
+        chance that a slot changed between its earlier fetch and that age.
+
+        :param observations: List of (slot_start, ingestion_ts, revised) tuples.
+        :return: Revision rate per probe age, None when there are too few probes.
+        """
+        probes = [0] * len(self.probe_ages)
+        revisions = [0] * len(self.probe_ages)
+        previous: dict[datetime, float] = {}
+        for slot, ingested, revised in sorted(observations, key=lambda o: (o[0], o[1])):
+            age = (ingested - slot).total_seconds()
+            index = self.probe_index(age)
+            if slot in previous and index is not None and previous[slot] < self.probe_ages[index].total_seconds():
+                probes[index] += 1
+                revisions[index] += revised
+            previous[slot] = age
+
+        return [revised / probed if probed >= RevisionTracker.MIN_SAMPLES else None for probed, revised in zip(probes, revisions, strict=True)]
+
+    def probes(
+        self,
+        observations: list[tuple[datetime, datetime, bool]],
+        current_slot: pendulum.DateTime,
+        now: pendulum.DateTime,
+    ) -> list[tuple[pendulum.DateTime, int]]:
+        """Find the older slots that passed a probe age since they were last fetched.
+
+        :param observations: List of (slot_start, ingestion_ts, revised) tuples.
+        :param current_slot: The slot the scheduled run fetches anyway.
+        :param now: Reference time for the slot ages.
+        :return: Ordered list of (slot_start, probe index) pairs, with the latest probe age each slot passed.
+        """
+        last_fetched: dict[datetime, datetime] = {}
+        for slot, ingested, _ in observations:
+            last_fetched[slot] = max(ingested, last_fetched.get(slot, ingested))
+
+        oldest = current_slot - self.max_lookback
+        probed = []
+        for slot, fetched in sorted(last_fetched.items()):
+            start = pendulum.instance(slot)
+            index = self.probe_index((now - start).total_seconds())
+            if not oldest <= start < current_slot or index is None:
+                continue
+            if (fetched - slot).total_seconds() < self.probe_ages[index].total_seconds():
+                probed.append((start, index))
+
+        return probed
+
+    def refetch_slots(
+        self,
+        observations: list[tuple[datetime, datetime, bool]],
+        current_slot: pendulum.DateTime,
+        now: pendulum.DateTime,
+        explore: bool = True,
+    ) -> list[pendulum.DateTime]:
+        """Select the older slots that passed a probe age since they were last fetched.
+
+        A slot is selected when the measured revision rate at the probe age reaches the threshold,
+        or, when exploring, when it belongs to the exploration sample.
+
+        :param observations: List of (slot_start, ingestion_ts, revised) tuples.
+        :param current_slot: The slot the scheduled run fetches anyway.
+        :param now: Reference time for the slot ages.
+        :param explore: Also select the exploration sample. Default is True; False keeps only slots with revision evidence.
+        :return: Ordered list of slot start times to refetch.
+        """
+        rates = self.revision_rates(observations)
+
+        selected = []
+        for slot, index in self.probes(observations, current_slot, now):
+            rate = rates[index]
+            if (explore and self.sampled(slot)) or (rate is not None and rate >= self.threshold):
+                selected.append(slot)
+
+        return selected
+
+    def plan(self, current_slot: pendulum.DateTime, now: pendulum.DateTime | None = None) -> pendulum.DateTime:
+        """Get the start of the single range call covering the current slot and every slot worth refetching.
+
+        As the range is contiguous, reaching back to a slot also refetches every slot after it. The range is
+        only extended as far as the expected revisions per added slot still reach the threshold; the exploration
+        sample is always covered, its cost being bounded by the sample rate.
+
+        :param current_slot: The slot the scheduled run fetches anyway.
+        :param now: Reference time for the slot ages. Default is the current time.
+        :return: The `date_from` of the range; equal to `current_slot` when nothing needs a refetch.
+        """
+        now = now or pendulum.now(tz="UTC")
+        observations = self.observations(now - RevisionTracker.HISTORY)
+        rates = self.revision_rates(observations)
+        probes = self.probes(observations, current_slot, now)
+
+        date_from = min([current_slot, *(slot for slot, _ in probes if self.sampled(slot))])
+        expected = 0.0
+        for slot, index in reversed(probes):
+            expected += rates[index] or 0.0
+            added = (current_slot - slot).total_seconds() / SLOT.total_seconds()
+            if expected / added >= self.threshold:
+                date_from = min(date_from, slot)
+
+        return date_from
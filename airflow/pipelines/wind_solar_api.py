@@ -1,10 +1,10 @@
 import http
-import json
 from typing import Any
 from urllib.parse import quote
 
 import pendulum
 import requests  # type: ignore
+from pipelines.payload import PayloadDecoder
 
 
 class WindSolarAPI:
@@ -30,6 +30,7 @@ class WindSolarAPI:
         :param from_date:   from start date in datetime format
         :param to_date:     to start date in datetime format
         :return:            JSON data as a dictionary
+        :raises msgspec.ValidationError: When the payload does not match the expected schema
         """
         url = WindSolarAPI.API_URL.format(
             from_date=self.url_friendly_datetime(from_date),
@@ -37,11 +38,13 @@ class WindSolarAPI:
         )
 
         response = requests.get(url)
-        payload = response.json()
 
         if response.status_code != http.HTTPStatus.OK:
             raise Exception(f"Failed to fetch data: {response.status_code}")
 
+        # Reject malformed items at extract time, keep the raw body as the snapshot
+        PayloadDecoder.decode(response.content)
+
         return {
             "ingestion_ts": pendulum.now(tz="UTC").to_iso8601_string(),
             "window_from_utc": from_date.to_iso8601_string(),
@@ -49,5 +52,5 @@ class WindSolarAPI:
             "data_type": "wind_and_solar_power",
             "request_url": url,
             "http_status": response.status_code,
-            "payload_json": json.dumps(payload),
+            "payload_json": response.content.decode(),
         }
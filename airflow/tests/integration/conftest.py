@@ -12,3 +12,12 @@ def dag_wind_and_solar_power_generation() -> DagBag | Any:
     bag.id = "wind_and_solar_power_generation"
 
     return bag
+
+
+@pytest.fixture(scope="module")
+def dag_bmrs_datasets_maintenance() -> DagBag | Any:
+    """Initialize the bmrs_datasets_maintenance DAG."""
+    bag = DagBag().get_dag("bmrs_datasets_maintenance")
+    bag.id = "bmrs_datasets_maintenance"
+
+    return bag
@@ -0,0 +1,27 @@
+from airflow.models import DagBag
+
+
+class TestBmrsDatasetsMaintenanceDAG:
+    """Test the bmrs_datasets_maintenance DAG."""
+
+    def test_dag_loaded(self, dag_bmrs_datasets_maintenance: DagBag) -> None:
+        """Test if the DAG is correctly loaded."""
+        assert DagBag().import_errors == {}, "Improper import"
+        assert dag_bmrs_datasets_maintenance.id in DagBag().dags, f"DAG '{dag_bmrs_datasets_maintenance.id}' is missing"
+        assert dag_bmrs_datasets_maintenance is not None, "DAG object is None"
+        assert len(dag_bmrs_datasets_maintenance.tasks) > 0, "No tasks in the DAG"
+
+    def test_dag_has_tag(self, dag_bmrs_datasets_maintenance: DagBag) -> None:
+        """Test if the DAG contains the correct tag."""
+        assert "maintenance" in dag_bmrs_datasets_maintenance.tags, "Tag 'maintenance' is missing in the DAG"
+
+    def test_task_count(self, dag_bmrs_datasets_maintenance: DagBag) -> None:
+        """Test the number of tasks in the DAG."""
+        expected_task_count = 2
+        assert len(dag_bmrs_datasets_maintenance.tasks) == expected_task_count, f"Expected 2 tasks, but got {len(dag_bmrs_datasets_maintenance.tasks)}"
+
+    def test_task_dependencies(self, dag_bmrs_datasets_maintenance: DagBag) -> None:
+        """Test the dependencies between the tasks."""
+        task = dag_bmrs_datasets_maintenance.get_task("archive")
+        assert task is not None, "Task 'archive' is missing in the DAG"
+        assert [t.task_id for t in task.upstream_list] == ["compact"], "Task 'archive' has incorrect upstream dependencies"
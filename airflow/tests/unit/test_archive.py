@@ -0,0 +1,104 @@
+import uuid
+from typing import Any
+from unittest.mock import MagicMock
+
+import pendulum
+import pytest
+from pipelines.archive import SnapshotArchive, SnapshotArchiver
+
+
+@pytest.fixture
+def snapshot_rows() -> list[dict[str, Any]]:
+    """Fixture providing raw snapshot rows."""
+    return [
+        {
+            "id": uuid.uuid4(),
+            "ingestion_ts": pendulum.datetime(2025, 1, 1, 0, 5),
+            "window_from_utc": pendulum.datetime(2024, 12, 31, 22, 30),
+            "window_to_utc": pendulum.datetime(2024, 12, 31, 22, 30),
+            "request_url": "https://example.com",
+            "http_status": 200,
+            "payload_json": '{"data": []}',
+        },
+        {
+            "id": uuid.uuid4(),
+            "ingestion_ts": pendulum.datetime(2025, 1, 1, 0, 35),
+            "window_from_utc": pendulum.datetime(2024, 12, 31, 23, 0),
+            "window_to_utc": pendulum.datetime(2024, 12, 31, 23, 0),
+            "request_url": "https://example.com",
+            "http_status": 200,
+            "payload_json": '{"data": []}',
+        },
+    ]
+
+
+class TestSnapshotArchive:
+    """Test class for SnapshotArchiver and SnapshotArchive."""
+
+    def test_write_partition_and_scan(self, tmp_path: Any, snapshot_rows: list[dict[str, Any]]) -> None:
+        """Test written partitions are read back with their partition keys."""
+        archiver = SnapshotArchiver(MagicMock(), root=str(tmp_path))
+        path = archiver.write_partition("wind_and_solar_power", "2025-01-01", snapshot_rows)
+
+        assert "data_type=wind_and_solar_power" in path
+        assert "day=2025-01-01" in path
+
+        rows = [row for batch in SnapshotArchive(str(tmp_path)).scan("wind_and_solar_power") for row in batch.to_pylist()]
+
+        assert [row["id"] for row in rows] == [str(row["id"]) for row in snapshot_rows]
+        assert rows[0]["ingestion_ts"] == snapshot_rows[0]["ingestion_ts"]
+        assert rows[0]["day"] == "2025-01-01"
+
+    def test_scan_prunes_partitions(self, tmp_path: Any, snapshot_rows: list[dict[str, Any]]) -> None:
+        """Test scans only read the requested data type and days."""
+        archiver = SnapshotArchiver(MagicMock(), root=str(tmp_path))
+        archiver.write_partition("wind_and_solar_power", "2025-01-01", snapshot_rows[:1])
+        archiver.write_partition("wind_and_solar_power", "2025-01-02", snapshot_rows[1:])
+        archiver.write_partition("other", "2025-01-02", snapshot_rows)
+
+        archive = SnapshotArchive(str(tmp_path))
+        rows = [row for batch in archive.scan("wind_and_solar_power", day_from="2025-01-02") for row in batch.to_pylist()]
+
+        assert [row["id"] for row in rows] == [str(snapshot_rows[1]["id"])]
+
+    def test_scan_missing_root(self, tmp_path: Any) -> None:
+        """Test scanning an archive that does not exist yet yields nothing."""
+        assert list(SnapshotArchive(str(tmp_path / "missing")).scan("wind_and_solar_power")) == []
+
+    def test_archive(self, tmp_path: Any, snapshot_rows: list[dict[str, Any]]) -> None:
+        """Test old snapshots are written per partition and deleted in their own transaction."""
+        db = MagicMock()
+        partition_rows = [MagicMock(_mapping=row) for row in snapshot_rows]
+        db.execute.side_effect = [
+            [("wind_and_solar_power", "2025-01-01")],  # partitions
+            partition_rows,  # rows of the partition
+            None,  # delete
+        ]
+
+        archived = SnapshotArchiver(db, root=str(tmp_path)).archive(
+            pendulum.duration(days=30),
+            now=pendulum.datetime(2025, 3, 1),
+        )
+
+        assert archived == len(snapshot_rows)
+        db.commit.assert_called_once()
+        assert len(list(tmp_path.glob("data_type=wind_and_solar_power/day=2025-01-01/*.parquet"))) == 1
+
+        # Both the partition listing and the partition read only select superseded snapshots.
+        for call in db.execute.call_args_list[:2]:
+            assert "EXISTS" in str(call.args[0])
+
+    def test_archive_keeps_file_consistent_on_failure(self, tmp_path: Any, snapshot_rows: list[dict[str, Any]]) -> None:
+        """Test the partition file is removed when the delete fails."""
+        db = MagicMock()
+        db.execute.side_effect = [
+            [("wind_and_solar_power", "2025-01-01")],
+            [MagicMock(_mapping=row) for row in snapshot_rows],
+            RuntimeError("delete failed"),
+        ]
+
+        with pytest.raises(RuntimeError):
+            SnapshotArchiver(db, root=str(tmp_path)).archive(pendulum.duration(days=30), now=pendulum.datetime(2025, 3, 1))
+
+        db.rollback.assert_called_once()
+        assert list(tmp_path.rglob("*.parquet")) == []
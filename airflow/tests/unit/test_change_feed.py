@@ -0,0 +1,40 @@
+from typing import Any
+from unittest.mock import MagicMock
+
+from pipelines.change_feed import ChangeFeed
+
+
+def change(seq: int) -> MagicMock:
+    """Build a mocked change row."""
+    return MagicMock(_mapping={"change_seq": seq, "psr_type": "Solar", "change_type": "revision"})
+
+
+class TestChangeFeed:
+    """Test class for ChangeFeed."""
+
+    def test_changes(self) -> None:
+        """Test a page is read after the cursor."""
+        db = MagicMock()
+        db.execute.return_value = [change(11), change(12)]
+
+        page = ChangeFeed(db).changes(cursor=10, limit=5)
+
+        assert [c["change_seq"] for c in page] == [11, 12]
+        assert db.execute.call_args.args[1] == {"cursor": 10, "limit": 5}
+
+    def test_stream(self) -> None:
+        """Test pages are read from the advancing cursor until a short page."""
+        db = MagicMock()
+        cursors: list[Any] = []
+
+        def mock_execute(statement: Any, params: dict[str, Any]) -> list[MagicMock]:
+            """Mock the feed with five changes."""
+            cursors.append(params["cursor"])
+            return [change(seq) for seq in range(params["cursor"] + 1, 6)][: params["limit"]]
+
+        db.execute.side_effect = mock_execute
+
+        pages = list(ChangeFeed(db, page_size=2).stream())
+
+        assert [[c["change_seq"] for c in page] for page in pages] == [[1, 2], [3, 4], [5]]
+        assert cursors == [0, 2, 4]
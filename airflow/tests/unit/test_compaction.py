@@ -0,0 +1,93 @@
+import uuid
+from typing import Any
+from unittest.mock import MagicMock
+
+import pendulum
+import pytest
+from pipelines.compaction import LOCK_NOT_AVAILABLE, SnapshotCompactor
+from sqlalchemy.exc import OperationalError
+
+
+def lock_error(pgcode: str) -> OperationalError:
+    """Build a driver error with the given Postgres error code."""
+    orig = Exception("lock error")
+    orig.pgcode = pgcode  # type: ignore[attr-defined]
+    return OperationalError("delete", {}, orig)
+
+
+def mock_db(oldest: list[tuple[str, pendulum.DateTime]], batches: list[Any]) -> MagicMock:
+    """Mock a session returning the oldest windows, then the given redundant batches, then nothing."""
+    db = MagicMock()
+    lookups = iter(batches)
+
+    def execute(statement: Any, params: dict[str, Any] | None = None) -> MagicMock:
+        result = MagicMock()
+        if "min(window_from_utc)" in str(statement):
+            result.all.return_value = oldest
+        elif "batch_size" in (params or {}):
+            batch: Any = next(lookups, [])
+            if isinstance(batch, Exception):
+                raise batch
+            result.all.return_value = batch
+        return result
+
+    db.execute.side_effect = execute
+    return db
+
+
+class TestSnapshotCompactor:
+    """Test class for SnapshotCompactor."""
+
+    def test_compact_in_batches(self) -> None:
+        """Test redundant snapshots are deleted batch by batch, one day of windows at a time."""
+        window = pendulum.datetime(2025, 1, 1)
+        first = [(uuid.uuid4(), window), (uuid.uuid4(), window.add(minutes=30))]
+        second = [(uuid.uuid4(), window.add(hours=1))]
+        db = mock_db([("wind_and_solar_power", window)], [first, second])
+
+        deleted = SnapshotCompactor(db, batch_size=2).compact(
+            pendulum.duration(hours=48),
+            now=pendulum.datetime(2025, 1, 5),
+        )
+
+        assert deleted == len(first) + len(second)
+
+        lookups = [c.args[1] for c in db.execute.call_args_list if len(c.args) > 1 and "batch_size" in c.args[1]]
+        # A full batch resumes within the same day from its last window, a short one moves to the next day.
+        assert (lookups[0]["after"], lookups[0]["until"]) == (window, window.add(days=1))
+        assert (lookups[1]["after"], lookups[1]["until"]) == (first[-1][1], window.add(days=1))
+        assert (lookups[2]["after"], lookups[2]["until"]) == (window.add(days=1), window.add(days=2))
+        expected_lookups = 3  # until the cutoff on 2025-01-03
+        assert len(lookups) == expected_lookups
+        assert all(lookup["data_type"] == "wind_and_solar_power" for lookup in lookups)
+        assert lookups[0]["cutoff"] == pendulum.datetime(2025, 1, 3)
+        assert db.commit.call_count == expected_lookups
+
+    def test_compact_nothing_to_delete(self) -> None:
+        """Test no lookups are issued when there is no settled window."""
+        db = mock_db([], [])
+
+        assert SnapshotCompactor(db).compact(pendulum.duration(hours=48)) == 0
+        db.commit.assert_not_called()
+
+    def test_compact_stops_on_lock_timeout(self) -> None:
+        """Test a lock timeout rolls back the batch and ends the run without failing it."""
+        window = pendulum.datetime(2025, 1, 1)
+        db = mock_db(
+            [("wind_and_solar_power", window), ("other", window)],
+            [[(uuid.uuid4(), window)], lock_error(LOCK_NOT_AVAILABLE)],
+        )
+
+        deleted = SnapshotCompactor(db, batch_size=1).compact(pendulum.duration(hours=48), now=pendulum.datetime(2025, 1, 5))
+
+        assert deleted == 1
+        db.rollback.assert_called_once()
+        lookups = [c.args[1] for c in db.execute.call_args_list if len(c.args) > 1 and "batch_size" in c.args[1]]
+        assert all(lookup["data_type"] == "wind_and_solar_power" for lookup in lookups)
+
+    def test_compact_raises_other_errors(self) -> None:
+        """Test database errors other than a lock timeout still fail the run."""
+        db = mock_db([("wind_and_solar_power", pendulum.datetime(2025, 1, 1))], [lock_error("57014")])
+
+        with pytest.raises(OperationalError):
+            SnapshotCompactor(db).compact(pendulum.duration(hours=48), now=pendulum.datetime(2025, 1, 5))
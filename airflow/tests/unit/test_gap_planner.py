@@ -0,0 +1,132 @@
+from typing import Any
+from unittest.mock import MagicMock
+
+import pendulum
+import pytest
+from pipelines.gap_planner import GapPlanner
+from pipelines.revision_tracker import RevisionTracker
+
+
+@pytest.fixture
+def planner() -> GapPlanner:
+    """Initialize the GapPlanner with a mocked session."""
+    return GapPlanner(MagicMock(), max_days=1)
+
+
+class TestGapPlanner:
+    """Test class for GapPlanner."""
+
+    def test_expected_slots(self) -> None:
+        """Test the slot grid is floored and inclusive of both ends."""
+        slots = GapPlanner.expected_slots(
+            pendulum.datetime(2024, 10, 16, 10, 45),
+            pendulum.datetime(2024, 10, 16, 12, 10),
+        )
+
+        assert slots == [
+            pendulum.datetime(2024, 10, 16, 10, 30),
+            pendulum.datetime(2024, 10, 16, 11, 0),
+            pendulum.datetime(2024, 10, 16, 11, 30),
+            pendulum.datetime(2024, 10, 16, 12, 0),
+        ]
+
+    def test_find_gaps(self) -> None:
+        """Test missing, incomplete and stale slots are selected."""
+        expected = GapPlanner.expected_slots(
+            pendulum.datetime(2024, 10, 16, 0, 0),
+            pendulum.datetime(2024, 10, 16, 2, 0),
+        )
+        fetched = pendulum.datetime(2024, 10, 17)
+        latest_snapshot = {
+            expected[0]: fetched,  # healthy
+            expected[1]: fetched,  # incomplete in the mart
+            expected[2]: fetched,  # stale, a revision is expected
+            expected[4]: fetched,  # healthy
+        }
+        complete = {expected[0], expected[2], expected[3], expected[4]}
+
+        gaps = GapPlanner.find_gaps(expected, latest_snapshot, complete, stale={expected[2]})
+
+        assert gaps == [expected[1], expected[2], expected[3]]
+
+    def test_steady_state_has_no_gaps(self) -> None:
+        """Test slots fetched once at +90 minutes by the schedule are not flagged, exploration sample included."""
+        now = pendulum.datetime(2024, 10, 17, 12)
+        expected = GapPlanner.expected_slots(now.subtract(days=1), now.subtract(hours=2))
+        tracker = RevisionTracker(MagicMock())
+        tracker.db.execute.return_value = [(slot, slot.add(minutes=95), False) for slot in expected]  # type: ignore[attr-defined]
+        planner = GapPlanner(MagicMock(), tracker=tracker)
+
+        assert any(tracker.sampled(slot) for slot in expected)
+
+        stale = planner.stale_slots(expected, now)
+        gaps = GapPlanner.find_gaps(expected, {slot: slot.add(minutes=95) for slot in expected}, set(expected), stale)
+
+        assert gaps == []
+
+    def test_stale_slots_with_revision_evidence(self) -> None:
+        """Test slots past an age with a measured revision rate are flagged."""
+        now = pendulum.datetime(2024, 10, 17, 12)
+        expected = GapPlanner.expected_slots(now.subtract(hours=6), now.subtract(hours=2))
+        observations = []
+        for hours in range(20, 28):
+            slot = now.subtract(hours=hours)
+            observations += [(slot, slot.add(minutes=95), False), (slot, slot.add(hours=4, minutes=5), True)]
+        observations += [(slot, slot.add(minutes=95), False) for slot in expected]
+        tracker = RevisionTracker(MagicMock(), sample_rate=0.0)
+        tracker.db.execute.return_value = observations  # type: ignore[attr-defined]
+        planner = GapPlanner(MagicMock(), tracker=tracker)
+
+        assert planner.stale_slots(expected, now) == {slot for slot in expected if now - slot >= pendulum.duration(hours=4)}
+
+    def test_stale_slots_without_tracker(self, planner: GapPlanner) -> None:
+        """Test staleness is only checked when a revision tracker is given."""
+        slot = pendulum.datetime(2024, 10, 16, 0, 0)
+
+        assert planner.stale_slots([slot], now=slot.add(days=1)) == set()
+
+    def test_merge_windows(self, planner: GapPlanner) -> None:
+        """Test adjacent slots are merged and non-adjacent slots start a new window."""
+        slots = [
+            pendulum.datetime(2024, 10, 16, 0, 0),
+            pendulum.datetime(2024, 10, 16, 0, 30),
+            pendulum.datetime(2024, 10, 16, 1, 0),
+            pendulum.datetime(2024, 10, 16, 3, 0),
+        ]
+
+        assert planner.merge_windows(slots) == [
+            {"date_from": slots[0], "date_to": slots[2]},
+            {"date_from": slots[3], "date_to": slots[3]},
+        ]
+
+    def test_merge_windows_respects_days_limit(self, planner: GapPlanner) -> None:
+        """Test a contiguous run longer than the days limit is split."""
+        slots = GapPlanner.expected_slots(
+            pendulum.datetime(2024, 10, 16, 0, 0),
+            pendulum.datetime(2024, 10, 17, 1, 0),
+        )
+
+        assert planner.merge_windows(slots) == [
+            {"date_from": slots[0], "date_to": pendulum.datetime(2024, 10, 16, 23, 30)},
+            {"date_from": pendulum.datetime(2024, 10, 17, 0, 0), "date_to": slots[-1]},
+        ]
+
+    def test_plan(self, planner: GapPlanner) -> None:
+        """Test the plan returns DAG-ready ISO8601 windows."""
+        slot = pendulum.datetime(2024, 10, 16, 0, 0)
+        settled = pendulum.datetime(2024, 10, 17)
+
+        def mock_execute(statement: Any, params: dict[str, Any]) -> list[tuple[Any, ...]]:
+            """Mock the snapshot and mart lookups."""
+            if "bmrs_datasets" in str(statement):
+                return [(slot, settled)]
+            return [(slot,)]
+
+        planner.db.execute.side_effect = mock_execute  # type: ignore[attr-defined]
+
+        assert planner.plan(slot, slot.add(hours=1), now=settled) == [
+            {
+                "date_from": "2024-10-16T00:30:00Z",
+                "date_to": "2024-10-16T01:00:00Z",
+            },
+        ]
@@ -0,0 +1,76 @@
+from typing import Any
+from unittest.mock import MagicMock
+
+import pendulum
+import pytest
+from pipelines.mart_reader import MartReader
+
+
+def mock_db(calls: list[dict[str, Any]]) -> MagicMock:
+    """Mock a session that returns one row per half hour of the requested range."""
+
+    def mock_execute(statement: Any, params: dict[str, Any], execution_options: dict[str, Any]) -> MagicMock:
+        """Mock the streamed mart query."""
+        calls.append(params)
+        rows = []
+        slot = params["date_from"]
+        while slot < params["date_to"]:
+            rows.append((slot, "Solar", 1.5))
+            slot = slot.add(minutes=30)
+        size = execution_options["yield_per"]
+        result = MagicMock()
+        result.partitions.return_value = iter([rows[i : i + size] for i in range(0, len(rows), size)])
+        return result
+
+    db = MagicMock()
+    db.execute.side_effect = mock_execute
+    return db
+
+
+class TestMartReader:
+    """Test class for MartReader."""
+
+    def test_batches_are_chunked(self) -> None:
+        """Test a range is streamed in batches of at most the chunk size."""
+        reader = MartReader(mock_db([]), chunk_size=10)
+
+        batches = list(reader.batches(pendulum.datetime(2025, 1, 1), pendulum.datetime(2025, 1, 2)))
+
+        assert [batch.num_rows for batch in batches] == [10, 10, 10, 10, 8]
+        assert batches[0].column("quantity").to_pylist()[0] == pytest.approx(1.5)
+
+    def test_psr_types_filter(self) -> None:
+        """Test the PSR types are passed to the query."""
+        calls: list[dict[str, Any]] = []
+        reader = MartReader(mock_db(calls))
+
+        reader.read(pendulum.datetime(2025, 1, 1), pendulum.datetime(2025, 1, 1, 1), psr_types=["Solar"])
+
+        assert calls[0]["psr_types"] == ["Solar"]
+
+    def test_settled_days_are_cached(self) -> None:
+        """Test settled whole days are read once and unsettled parts are always streamed."""
+        calls: list[dict[str, Any]] = []
+        reader = MartReader(mock_db(calls), cache_days=2, settle_after=pendulum.duration(days=1))
+        expected_rows = 72
+
+        first = reader.read(pendulum.datetime(2025, 1, 2), pendulum.datetime(2025, 1, 3, 12))
+        second = reader.read(pendulum.datetime(2025, 1, 2), pendulum.datetime(2025, 1, 3, 12))
+
+        assert first.equals(second)
+        assert first.num_rows == expected_rows
+        # 2 Jan is cached after the first read, 3 Jan is partial and streamed both times
+        assert [c["date_from"] for c in calls] == [
+            pendulum.datetime(2025, 1, 2),
+            pendulum.datetime(2025, 1, 3),
+            pendulum.datetime(2025, 1, 3),
+        ]
+
+    def test_cache_evicts_least_recent_day(self) -> None:
+        """Test the cache holds at most the configured number of days."""
+        reader = MartReader(mock_db([]), cache_days=1)
+
+        reader.cached_day(pendulum.datetime(2025, 1, 1), ())
+        reader.cached_day(pendulum.datetime(2025, 1, 2), ())
+
+        assert list(reader._cache) == [(pendulum.datetime(2025, 1, 2), ())]
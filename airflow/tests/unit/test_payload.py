@@ -0,0 +1,43 @@
+import json
+from datetime import date, datetime, timezone
+from typing import Any
+
+import msgspec
+import pytest
+from pipelines.payload import PayloadDecoder
+
+
+class TestPayloadDecoder:
+    """Test class for PayloadDecoder."""
+
+    def test_decode(self, mock_data: dict[str, list[dict[str, Any]]]) -> None:
+        """Test a valid payload is decoded into typed items.
+
+        :param mock_data: Mocked data from fixture.
+        """
+        payload = PayloadDecoder.decode(json.dumps(mock_data))
+
+        assert len(payload.data) == len(mock_data["data"])
+        item = payload.data[0]
+        assert item.start_time == datetime(2023, 7, 21, 4, 30, tzinfo=timezone.utc)
+        assert item.psr_type == "Wind Onshore"
+        assert item.quantity == pytest.approx(640.283)
+        assert item.settlement_date == date(2023, 7, 21)
+        assert isinstance(payload.data[2].quantity, float)
+
+    @pytest.mark.parametrize(
+        "item",
+        [
+            {"psrType": "Solar", "quantity": 1, "settlementDate": "2023-07-21", "settlementPeriod": 12},
+            {"startTime": "2023-07-21T04:30:00Z", "psrType": "", "quantity": 1, "settlementDate": "2023-07-21", "settlementPeriod": 12},
+            {"startTime": "2023-07-21T04:30:00Z", "psrType": "Solar", "quantity": "1", "settlementDate": "2023-07-21", "settlementPeriod": 12},
+            {"startTime": "2023-07-21T04:30:00Z", "psrType": "Solar", "quantity": 1, "settlementDate": "2023-07-21", "settlementPeriod": 0},
+        ],
+    )
+    def test_decode_rejects_malformed_item(self, item: dict[str, Any]) -> None:
+        """Test malformed items raise a validation error.
+
+        :param item: Malformed generation item.
+        """
+        with pytest.raises(msgspec.ValidationError):
+            PayloadDecoder.decode(json.dumps({"data": [item]}))
@@ -0,0 +1,135 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any
+from unittest.mock import MagicMock
+
+import pendulum
+import pytest
+from pipelines.reprocess import Checkpoint, Reprocessor, chunks, flatten, latest_per_key
+
+START = datetime(2023, 7, 21, 4, 30, tzinfo=timezone.utc)
+
+
+class TestReprocess:
+    """Test the reprocessing command helpers."""
+
+    def test_flatten(self, mock_data: dict[str, list[dict[str, Any]]]) -> None:
+        """Test payloads are flattened and malformed payloads are counted.
+
+        :param mock_data: Mocked data from fixture.
+        """
+        items, malformed = flatten([json.dumps(mock_data), "not json", '{"data": [{"psrType": "Solar"}]}'])
+
+        assert items[0] == (START, "Wind Onshore", 640.283)
+        assert len(items) == len(mock_data["data"])
+        expected_malformed = 2
+        assert malformed == expected_malformed
+
+    def test_latest_per_key(self) -> None:
+        """Test the last item of a key wins across batches."""
+        latest: dict[tuple[datetime, str], float] = {}
+        latest_per_key([(START, "Solar", 1.0), (START, "Wind Onshore", 2.0)], latest)
+        latest_per_key([(START, "Solar", 3.0)], latest)
+
+        assert latest == {(START, "Solar"): 3.0, (START, "Wind Onshore"): 2.0}
+
+    def test_chunks(self) -> None:
+        """Test a range is split into consecutive chunks with a short last chunk."""
+        assert list(chunks(pendulum.datetime(2025, 1, 1), pendulum.datetime(2025, 1, 2, 12), pendulum.duration(days=1))) == [
+            (pendulum.datetime(2025, 1, 1), pendulum.datetime(2025, 1, 2)),
+            (pendulum.datetime(2025, 1, 2), pendulum.datetime(2025, 1, 2, 12)),
+        ]
+
+    def test_checkpoint(self, tmp_path: Any) -> None:
+        """Test a checkpoint resumes the same range and is ignored for a different range."""
+        path = str(tmp_path / "checkpoint.json")
+        date_from, date_to = pendulum.datetime(2025, 1, 1), pendulum.datetime(2025, 2, 1)
+        checkpoint = Checkpoint(path, date_from, date_to)
+
+        assert checkpoint.resume_from() == date_from
+
+        checkpoint.save(pendulum.datetime(2025, 1, 10))
+
+        assert Checkpoint(path, date_from, date_to).resume_from() == pendulum.datetime(2025, 1, 10)
+        assert Checkpoint(path, date_from, date_to.add(days=1)).resume_from() == date_from
+
+    def test_flattened_bounds_in_flight(self) -> None:
+        """Test no more than `max_in_flight` batches are submitted ahead of the results being consumed."""
+        db = MagicMock()
+        db.execute.return_value.scalars.return_value.partitions.return_value = iter([["a"], ["b"], ["c"], ["d"], ["e"]])
+        submitted: list[str] = []
+        pool = MagicMock()
+
+        def submit(fn: Any, batch: list[str]) -> MagicMock:
+            submitted.extend(batch)
+            future = MagicMock()
+            future.result.return_value = ([], len(submitted))
+            return future
+
+        pool.submit.side_effect = submit
+        reprocessor = Reprocessor(db, pool, batch_size=1, max_in_flight=2)
+        stream = reprocessor.flattened(pendulum.datetime(2025, 1, 1), pendulum.datetime(2025, 1, 2))
+
+        expected_in_flight = 2
+        assert next(stream) == ([], 1)
+        assert len(submitted) == expected_in_flight
+        assert [order for _, order in stream] == [2, 3, 4, 5]
+
+    @pytest.mark.parametrize(
+        ("snapshots", "expected_batch"),
+        [(48, 3), (0, 1), (100000, 500)],
+    )
+    def test_sized_batch(self, snapshots: int, expected_batch: int) -> None:
+        """Test batches spread a range's snapshots over every in-flight slot, within bounds.
+
+        :param snapshots: Snapshots in the range.
+        :param expected_batch: Expected batch size with 8 workers and 2 batches each in flight.
+        """
+        db = MagicMock()
+        db.execute.return_value.scalar_one.return_value = snapshots
+
+        assert Reprocessor(db, MagicMock(), max_in_flight=16).sized_batch(pendulum.datetime(2025, 1, 1), pendulum.datetime(2025, 1, 2)) == expected_batch
+
+        configured_batch = 50
+        assert Reprocessor(db, MagicMock(), batch_size=configured_batch).sized_batch(pendulum.datetime(2025, 1, 1), pendulum.datetime(2025, 1, 2)) == configured_batch
+
+    def test_run(self, mock_data: dict[str, list[dict[str, Any]]]) -> None:
+        """Test a range is streamed, flattened in the pool, staged and applied in one transaction.
+
+        :param mock_data: Mocked data from fixture.
+        """
+        revised = json.loads(json.dumps(mock_data))
+        revised["data"][2]["quantity"] = 95
+
+        db = MagicMock()
+        db.execute.return_value.scalars.return_value.partitions.return_value = iter([[json.dumps(mock_data)], [json.dumps(revised)]])
+        expected_changed = 3
+        db.execute.return_value.scalar_one.return_value = expected_changed
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            written, malformed = Reprocessor(db, pool, batch_size=1).run(pendulum.datetime(2025, 1, 1), pendulum.datetime(2025, 1, 2))
+
+        assert (written, malformed) == (expected_changed, 0)
+        statements = [str(call.args[0]) for call in db.execute.call_args_list]
+        assert "lock table mart.wind_and_solar_power_changes" in statements[1]
+        staged = db.execute.call_args_list[3].args[1]
+        assert len(staged) == len(mock_data["data"])
+        assert {"start_time": START, "psr_type": "Solar", "quantity": 95.0} in staged
+        apply = db.execute.call_args_list[4]
+        assert "insert into mart.wind_and_solar_power_changes" in str(apply.args[0])
+        # The newer-snapshot probe is bounded by the longest window so it stays an index range scan.
+        assert "raw.window_from_utc >= staged.start_time - interval '7 days'" in str(apply.args[0])
+        assert apply.args[1] == {"date_to": pendulum.datetime(2025, 1, 2)}
+        db.commit.assert_called_once()
+
+    def test_run_empty(self) -> None:
+        """Test a range without snapshots writes nothing and still commits."""
+        db = MagicMock()
+        db.execute.return_value.scalars.return_value.partitions.return_value = iter([])
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            assert Reprocessor(db, pool, batch_size=1).run(pendulum.datetime(2025, 1, 1), pendulum.datetime(2025, 1, 2)) == (0, 0)
+
+        db.execute.assert_called_once()
+        db.commit.assert_called_once()
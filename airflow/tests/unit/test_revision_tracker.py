@@ -0,0 +1,137 @@
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pendulum
+import pytest
+from pipelines.revision_tracker import RevisionTracker
+
+NOW = pendulum.datetime(2025, 1, 10, 12, 5)
+CURRENT_SLOT = pendulum.datetime(2025, 1, 10, 10, 30)
+
+
+@pytest.fixture
+def tracker() -> RevisionTracker:
+    """Initialize the RevisionTracker with a mocked session."""
+    return RevisionTracker(MagicMock(), max_lookback=pendulum.duration(hours=24), threshold=0.5, sample_rate=0.0)
+
+
+def history(revised: bool = True) -> list[tuple[datetime, datetime, bool]]:
+    """Build a history where old slots were first fetched after 95 minutes and probed again after 4 hours."""
+    observations: list[tuple[datetime, datetime, bool]] = []
+    for hours in range(20, 28):
+        slot = CURRENT_SLOT.subtract(hours=hours)
+        observations.append((slot, slot.add(minutes=95), False))
+        observations.append((slot, slot.add(hours=4, minutes=5), revised))
+    return observations
+
+
+def steady_state() -> list[tuple[datetime, datetime, bool]]:
+    """Build 300 slots that were each fetched once by the scheduled run."""
+    slots = [CURRENT_SLOT.subtract(minutes=30 * i) for i in range(1, 301)]
+    return [(slot, slot.add(minutes=95), False) for slot in slots if slot.add(minutes=95) <= NOW]
+
+
+class TestRevisionTracker:
+    """Test class for RevisionTracker."""
+
+    def test_refetch_slots_picks_slots_past_revision_age(self, tracker: RevisionTracker) -> None:
+        """Test slots fetched only before the usual revision age are selected."""
+        slot = CURRENT_SLOT.subtract(hours=5)
+        observations = [*history(), (slot, slot.add(minutes=95), False)]
+
+        assert tracker.refetch_slots(observations, CURRENT_SLOT, NOW) == [slot]
+
+    def test_refetch_slots_skips_slots_already_refetched(self, tracker: RevisionTracker) -> None:
+        """Test a slot fetched after the usual revision age is not selected again."""
+        slot = CURRENT_SLOT.subtract(hours=5)
+        observations = [*history(), (slot, slot.add(minutes=95), False), (slot, slot.add(hours=4, minutes=30), False)]
+
+        assert tracker.refetch_slots(observations, CURRENT_SLOT, NOW) == []
+
+    def test_refetch_slots_skips_slots_too_young(self, tracker: RevisionTracker) -> None:
+        """Test a slot younger than the usual revision age is not selected yet."""
+        slot = CURRENT_SLOT.subtract(hours=1)
+        observations = [*history(), (slot, slot.add(minutes=95), False)]
+
+        assert tracker.refetch_slots(observations, CURRENT_SLOT, NOW) == []
+
+    def test_refetch_slots_without_revisions(self, tracker: RevisionTracker) -> None:
+        """Test slots are not refetched when probes at that age never found a revision."""
+        slot = CURRENT_SLOT.subtract(hours=5)
+        observations = [*history(revised=False), (slot, slot.add(minutes=95), False)]
+
+        assert tracker.refetch_slots(observations, CURRENT_SLOT, NOW) == []
+
+    def test_refetch_slots_bootstraps_from_sample(self) -> None:
+        """Test slots fetched once by the schedule still get a sample probed past each probe age."""
+        tracker = RevisionTracker(MagicMock())
+        observations = steady_state()
+
+        selected = tracker.refetch_slots(observations, CURRENT_SLOT, NOW)
+
+        assert selected
+        assert all(tracker.sampled(slot) for slot in selected)
+        assert all(NOW - slot >= pendulum.duration(hours=4) and slot >= CURRENT_SLOT.subtract(hours=24) for slot in selected)
+
+    def test_refetch_slots_without_exploration(self) -> None:
+        """Test the exploration sample is left out when only revision evidence should count."""
+        tracker = RevisionTracker(MagicMock())
+
+        assert tracker.refetch_slots(steady_state(), CURRENT_SLOT, NOW, explore=False) == []
+
+    def test_sample_rate(self) -> None:
+        """Test the exploration sample is close to the configured share of slots."""
+        sample_rate = 0.1
+        tracker = RevisionTracker(MagicMock(), sample_rate=sample_rate)
+        slots = [CURRENT_SLOT.subtract(minutes=30 * i) for i in range(2000)]
+
+        share = sum(tracker.sampled(slot) for slot in slots) / len(slots)
+
+        assert share == pytest.approx(sample_rate, abs=0.03)
+
+    def test_revision_rates(self, tracker: RevisionTracker) -> None:
+        """Test rates are measured per probe age from refetches that followed an earlier fetch."""
+        observations = history()
+        slot = CURRENT_SLOT.subtract(hours=30)
+        observations += [(slot, slot.add(minutes=95), False), (slot, slot.add(hours=12, minutes=5), False)]
+
+        # 8 of 8 probes at 4 hours found a revision, 1 probe at 12 hours is too few to trust
+        assert tracker.revision_rates(observations) == [1.0, None]
+
+    def test_plan(self, tracker: RevisionTracker) -> None:
+        """Test the plan extends the range back while the expected revisions per added slot reach the threshold."""
+        tracker.threshold = 0.25
+        slots = [CURRENT_SLOT.subtract(hours=4), CURRENT_SLOT.subtract(hours=4, minutes=30), CURRENT_SLOT.subtract(hours=5)]
+        tracker.db.execute.return_value = [*history(), *((slot, slot.add(minutes=95), False) for slot in slots)]  # type: ignore[attr-defined]
+
+        # 1 revision expected over 8 added slots, 2 over 9, then 3 over 10 reaches the threshold
+        assert tracker.plan(CURRENT_SLOT, now=NOW) == slots[-1]
+
+    def test_plan_skips_long_spans_with_few_revisions(self) -> None:
+        """Test a low revision rate does not pull many unchanged slots into every run."""
+        tracker = RevisionTracker(MagicMock(), threshold=0.05, sample_rate=0.0)
+        revised_hours = 20
+        observations: list[tuple[datetime, datetime, bool]] = []
+        for hours in range(revised_hours, 40):
+            slot = CURRENT_SLOT.subtract(hours=hours)
+            observations += [(slot, slot.add(minutes=95), False), (slot, slot.add(hours=12, minutes=5), hours == revised_hours)]
+        slot = CURRENT_SLOT.subtract(hours=12)
+        observations.append((slot, slot.add(minutes=95), False))
+        tracker.db.execute.return_value = observations  # type: ignore[attr-defined]
+
+        # The 12-hour rate of 1 in 20 reaches the per-slot threshold, but not across the 24 slots it would add
+        assert tracker.refetch_slots(observations, CURRENT_SLOT, NOW) == [slot]
+        assert tracker.plan(CURRENT_SLOT, now=NOW) == CURRENT_SLOT
+
+    def test_plan_covers_exploration_sample(self) -> None:
+        """Test a sampled slot extends the range without revision evidence."""
+        tracker = RevisionTracker(MagicMock())
+        tracker.db.execute.return_value = steady_state()  # type: ignore[attr-defined]
+
+        assert tracker.plan(CURRENT_SLOT, now=NOW) == min(tracker.refetch_slots(steady_state(), CURRENT_SLOT, NOW))
+
+    def test_plan_defaults_to_current_slot(self, tracker: RevisionTracker) -> None:
+        """Test the plan is the current slot when there is no history."""
+        tracker.db.execute.return_value = []  # type: ignore[attr-defined]
+
+        assert tracker.plan(CURRENT_SLOT, now=NOW) == CURRENT_SLOT
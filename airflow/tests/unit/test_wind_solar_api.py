@@ -1,6 +1,8 @@
+import json
 from http import HTTPStatus
 from typing import Any
 
+import msgspec
 import pendulum
 import pytest
 from pipelines.wind_solar_api import WindSolarAPI
@@ -27,9 +29,7 @@ class TestWindSolarAPI:
             """Mock response."""
 
             status_code = HTTPStatus.OK
-
-            def json(self) -> dict[str, list[dict[str, Any]]]:
-                return mock_data
+            content = json.dumps(mock_data).encode()
 
         def mock_get(url: str) -> MockResponse:
             """Mock function for requests.get(url)."""
@@ -50,3 +50,20 @@ class TestWindSolarAPI:
         assert result["http_status"] == HTTPStatus.OK
         assert "wind-and-solar" in result["request_url"]
         assert '"psrType": "Wind Onshore"' in result["payload_json"]
+
+    def test_fetch_json_rejects_malformed_payload(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test a malformed payload fails at extract time."""
+
+        class MockResponse:
+            """Mock response."""
+
+            status_code = HTTPStatus.OK
+            content = b'{"data": [{"startTime": "not a date", "psrType": "Solar"}]}'
+
+        monkeypatch.setattr("pipelines.wind_solar_api.requests.get", lambda url: MockResponse())
+
+        with pytest.raises(msgspec.ValidationError):
+            WindSolarAPI().fetch_json(pendulum.datetime(2024, 10, 10), pendulum.datetime(2024, 10, 12))
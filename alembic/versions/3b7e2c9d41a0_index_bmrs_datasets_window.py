@@ -0,0 +1,34 @@
+"""index bmrs_datasets request windows.
+
+Revision ID: 3b7e2c9d41a0
+Revises: fceb31b6a18d
+Create Date: 2026-10-19 09:12:27.518204
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3b7e2c9d41a0"
+down_revision: str | Sequence[str] | None = "fceb31b6a18d"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create the index."""
+    op.create_index(
+        "ix_bmrs_datasets_data_type_window",
+        "bmrs_datasets",
+        ["data_type", "window_from_utc", "window_to_utc"],
+    )
+
+
+def downgrade() -> None:
+    """Drop the index."""
+    op.drop_index(
+        "ix_bmrs_datasets_data_type_window",
+        table_name="bmrs_datasets",
+    )
@@ -0,0 +1,82 @@
+{% set lookback_hours = var('lookback_hours', 6) %}
+
+-- Append-only
+{% if is_incremental() %}
+    -- Keys touched by the snapshots ingested within the lookback window.
+    with touched as (
+        select distinct
+            (generation_items.generation_item ->> 'startTime')::timestamptz as start_time,
+            generation_items.generation_item ->> 'psrType' as psr_type
+        from {{ ref('stg_wind_solar_power') }} as staged
+        cross join
+            lateral jsonb_array_elements(staged.payload_json -> 'data')
+                as generation_items (generation_item)
+        where staged.ingestion_ts >= now() - interval '{{ lookback_hours }} hour'
+    ),
+
+    -- Last quantity published to the feed for each touched key, one index lookup per key.
+    last_published as (
+        select
+            touched.start_time,
+            touched.psr_type,
+            latest.new_quantity
+        from touched
+        cross join lateral (
+            select feed.new_quantity
+            from {{ this }} as feed
+            where
+                feed.start_time = touched.start_time
+                and feed.psr_type = touched.psr_type
+            order by feed.change_seq desc
+            limit 1
+        ) as latest
+    ),
+
+    last_seq as (
+        select coalesce(max(change_seq), 0) as change_seq
+        from {{ this }}
+    ),
+
+    changed as (
+        select
+            mart.start_time,
+            mart.psr_type,
+            last_published.new_quantity as old_quantity,
+            mart.quantity as new_quantity
+        from {{ ref('wind_and_solar_power') }} as mart
+        inner join touched
+            on
+                mart.start_time = touched.start_time
+                and mart.psr_type = touched.psr_type
+        left join last_published
+            on
+                mart.start_time = last_published.start_time
+                and mart.psr_type = last_published.psr_type
+        where last_published.new_quantity is distinct from mart.quantity
+    )
+{% else %}
+    with last_seq as (
+        select 0::bigint as change_seq
+    ),
+
+    changed as (
+        select
+            start_time,
+            psr_type,
+            null::numeric as old_quantity,
+            quantity as new_quantity
+        from {{ ref('wind_and_solar_power') }}
+    )
+{% endif %}
+
+select
+    last_seq.change_seq
+    + row_number() over (order by changed.start_time, changed.psr_type) as change_seq,
+    changed.start_time,
+    changed.psr_type,
+    case when changed.old_quantity is null then 'insert' else 'revision' end as change_type,
+    changed.old_quantity,
+    changed.new_quantity,
+    now() as changed_at
+from changed
+cross join last_seq